@@ -1,12 +1,16 @@
 # Portfolio auth API — codename Janus (Roman god of doorways and transitions).
 
 # Standard library imports
+import logging
 import os
+import re
 import time
-from datetime import datetime
+from functools import lru_cache
 
 # Third-party imports
+import orjson
 from flask import Flask, request, jsonify
+from flask.json.provider import DefaultJSONProvider, JSONProvider
 from flask_cors import CORS
 
 # Local imports
@@ -17,6 +21,7 @@ from core.auth_service import (
     verify_password,
 )
 from services.logging_service import get_flask_app_logger
+from services.time_cache import iso_now
 from services.firebase_service import (
     get_habits_map, merge_habits_map, patch_habit_cell,
     get_user_record,
@@ -41,13 +46,62 @@ from services.firebase_service import (
     get_meal_plan_sections,
     get_meal_plan_daily,
     update_meal_plan_daily,
+    open_user_doc_scope,
 )
 
 # Initialize logger
 logger = get_flask_app_logger()
 
+
+class ORJSONProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson; same sorted keys and fallbacks as the default provider.
+    orjson only handles 64-bit integers (it refuses larger ones when encoding and silently turns
+    them into floats when decoding), and rejects input the stdlib parser accepts (NaN/Infinity,
+    lone surrogate escapes), so those cases go through the stdlib-based default provider.
+    datetime values are encoded as ISO 8601 rather than HTTP dates, and non-ASCII text as UTF-8
+    rather than \\u escapes; output is always compact with a trailing newline on responses.
+    """
+
+    _OPTIONS = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+    # 19+ digit runs may not fit in 64 bits; the check is cheap and false positives only cost speed.
+    _LONG_DIGITS_STR = re.compile(r"\d{19}")
+    _LONG_DIGITS_BYTES = re.compile(rb"\d{19}")
+
+    def __init__(self, app):
+        super().__init__(app)
+        self._stdlib = DefaultJSONProvider(app)
+
+    def dumps(self, obj, **kwargs):
+        try:
+            return orjson.dumps(obj, default=DefaultJSONProvider.default, option=self._OPTIONS).decode()
+        except TypeError:
+            # Integers outside 64 bits (or types the default provider rejects too); formatted like orjson output.
+            kwargs.setdefault("separators", (",", ":"))
+            kwargs.setdefault("ensure_ascii", False)
+            return self._stdlib.dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        """Like the default provider: serialised body plus a trailing newline."""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(f"{self.dumps(obj)}\n", mimetype="application/json")
+
+    def loads(self, s, **kwargs):
+        pattern = self._LONG_DIGITS_STR if isinstance(s, str) else self._LONG_DIGITS_BYTES
+        if not pattern.search(s):
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                # NaN/Infinity and similar; the stdlib decides (and raises ValueError if truly malformed).
+                pass
+        return self._stdlib.loads(s, **kwargs)
+
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
+# Registered first so the per-request user document memo exists for every later hook and view
+app.before_request(open_user_doc_scope)
 
 
 def _bearer_token():
@@ -56,40 +110,59 @@ def _bearer_token():
         return auth[7:].strip()
     return None
 
+
+def _json_body():
+    """Parsed JSON object body (cached by Flask), or {} when missing, malformed, or not an object."""
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else {}
+
+
+def _client_ip():
+    """
+    Client address appended by the nearest proxy (last X-Forwarded-For hop), else the socket peer.
+    Earlier hops are whatever the client sent, so they are not trusted.
+    """
+    forwarded = request.headers.get("X-Forwarded-For")
+    if forwarded:
+        return forwarded.rpartition(",")[2].strip()
+    return request.remote_addr
+
+def _elapsed_ms(start_ns):
+    """Milliseconds since a time.perf_counter_ns() reading, rounded for logging."""
+    return round((time.perf_counter_ns() - start_ns) / 1e6, 2)
+
 # Request logging middleware
 @app.before_request
 def log_request_info():
     """Log request information before processing"""
-    request.start_time = time.time()
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
+    request.start_time = time.perf_counter_ns()
 
     # Extract client information
-    client_ip = request.headers.get('X-Forwarded-For', request.remote_addr)
     user_agent = request.headers.get('User-Agent', 'Unknown')
 
     logger.info("Request received", extra={
         "operation": "request_received",
         "method": request.method,
         "path": request.path,
-        "client_ip": client_ip,
+        "client_ip": _client_ip(),
         "user_agent": user_agent[:100],  # Truncate long user agents
         "content_length": request.content_length or 0,
-        "timestamp": datetime.utcnow().isoformat()
     })
 
 @app.after_request
 def log_response_info(response):
     """Log response information after processing"""
-    if hasattr(request, 'start_time'):
-        duration = (time.time() - request.start_time) * 1000  # Convert to milliseconds
-
+    if hasattr(request, 'start_time') and logger.isEnabledFor(logging.INFO):
         logger.info("Request completed", extra={
             "operation": "request_completed",
             "method": request.method,
             "path": request.path,
             "status_code": response.status_code,
-            "duration_ms": round(duration, 2),
-            "response_size": len(response.get_data()),
-            "timestamp": datetime.utcnow().isoformat()
+            "duration_ms": _elapsed_ms(request.start_time),
+            "response_size": response.calculate_content_length() or 0,
         })
 
     return response
@@ -97,7 +170,7 @@ def log_response_info(response):
 
 @app.route("/api/auth/register", methods=["POST"])
 def auth_register():
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     email = data.get("email")
     password = data.get("password")
     payload, err, _ = register_user(email, password)
@@ -121,7 +194,7 @@ def auth_register():
 
 @app.route("/api/auth/login", methods=["POST"])
 def auth_login():
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     email = data.get("email")
     password = data.get("password")
     payload, err, _ = login_user(email, password)
@@ -151,7 +224,7 @@ def auth_delete_account():
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
 
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     password = data.get("password")
     if not password:
         return jsonify({"status": "error", "error": "Password is required"}), 400
@@ -164,10 +237,11 @@ def auth_delete_account():
     if not ok:
         return jsonify({"status": "error", "error": err or "Could not delete account"}), 500
 
-    logger.info("Account deleted via API", extra={
-        "operation": "auth_delete_account",
-        "email": email,
-    })
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Account deleted via API", extra={
+            "operation": "auth_delete_account",
+            "email": email,
+        })
     return jsonify({"status": "success"}), 200
 
 
@@ -187,7 +261,7 @@ def habits_put_merge():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     incoming = data.get("cells")
     if not isinstance(incoming, dict):
         return jsonify({"status": "error", "error": "invalid_body"}), 400
@@ -206,7 +280,7 @@ def habits_patch_cell():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     date_str = data.get("date")
     habit_id = data.get("habitId")
     state = data.get("state")
@@ -238,7 +312,7 @@ def user_habits_put():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     incoming = data.get("habits")
     if not isinstance(incoming, list):
         return jsonify({"status": "error", "error": "invalid_body"}), 400
@@ -269,7 +343,7 @@ def user_habit_categories_post():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     label = data.get("label")
     ok, err, categories = add_habit_category(email, label)
     if not ok:
@@ -288,7 +362,7 @@ def user_habit_categories_patch():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     category_id = data.get("id")
     label = data.get("label")
     ok, err, categories = update_habit_category(email, category_id, label)
@@ -310,7 +384,7 @@ def user_habit_categories_delete():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     category_id = data.get("id")
     reassign_to = data.get("reassignTo")
     ok, err, categories = delete_habit_category(email, category_id, reassign_to)
@@ -344,7 +418,7 @@ def user_todos_post():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     text = data.get("text")
     ok, err, todos = add_todo_item(email, text)
     if not ok:
@@ -365,7 +439,7 @@ def user_todos_delete():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     todo_id = data.get("todoId") or data.get("id")
     ok, err, todos = delete_todo_item(email, todo_id)
     if not ok:
@@ -396,7 +470,7 @@ def user_flashcards_put():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     incoming = data.get("groups")
     if not isinstance(incoming, list):
         return jsonify({"status": "error", "error": "invalid_body"}), 400
@@ -417,7 +491,7 @@ def user_flashcards_groups_post():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     name = data.get("name")
     ok, err, groups = add_flashcard_group(email, name)
     if not ok:
@@ -436,7 +510,7 @@ def user_flashcards_cards_post():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     group_id = data.get("groupId")
     front = data.get("front")
     back = data.get("back")
@@ -485,7 +559,7 @@ def user_nutrition_put():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     incoming = data.get("history")
     if not isinstance(incoming, dict):
         return jsonify({"status": "error", "error": "invalid_body"}), 400
@@ -516,7 +590,7 @@ def user_stoic_put():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     date_key = data.get("date")
     form = data.get("form")
     ok, err, payload = update_stoic_journal(email, date_key, form)
@@ -546,7 +620,7 @@ def user_day_planner_options_post():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     label = data.get("label")
     ok, err, options = add_day_planner_option(email, label)
     if not ok:
@@ -565,7 +639,7 @@ def user_day_planner_options_patch():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     option_id = data.get("id")
     label = data.get("label")
     ok, err, options = update_day_planner_option(email, option_id, label)
@@ -587,7 +661,7 @@ def user_day_planner_options_delete():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     option_id = data.get("id")
     ok, err, options = delete_day_planner_option(email, option_id)
     if not ok:
@@ -618,7 +692,7 @@ def user_day_planner_daily_put():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     date_key = data.get("date")
     slots = data.get("slots")
     ok, err, payload = update_day_planner_daily(email, date_key, slots)
@@ -649,7 +723,7 @@ def user_meal_plan_put():
     email = decode_access_token(token)
     if not email:
         return jsonify({"status": "error", "error": "Unauthorized"}), 401
-    data = request.get_json(silent=True) or {}
+    data = _json_body()
     date_key = data.get("date")
     selections = data.get("selections")
     completed = data.get("completed")
@@ -664,128 +738,134 @@ def user_meal_plan_put():
     return jsonify({"status": "success", "entry": payload}), 200
 
 
+# Static payloads for / and /health; only the timestamp changes, at 1s resolution.
+_API_INFO = {
+    'message': 'Portfolio Auth API',
+    'version': '1.0.0',
+    'endpoints': {
+        'POST /api/auth/register': 'Register with email and password (password stored as hash)',
+        'POST /api/auth/login': 'Login; returns JWT bearer token',
+        'GET /api/auth/me': 'Current user from Authorization: Bearer <token>',
+        'DELETE /api/auth/account': 'Delete account; JSON body { password } required',
+        'GET /api/habits': 'Habit tracker cells for current user (JSON map)',
+        'PUT /api/habits': 'Merge habit cells body { cells: { "YYYY-MM-DD_id": "done"|"none" } }',
+        'PATCH /api/habits/cell': 'Set one cell { date, habitId, state }',
+        'GET /api/user/habits': 'List habit definitions { id, label, category }',
+        'PUT /api/user/habits': 'Replace habits body { habits: [...] }; category must exist',
+        'GET /api/user/habit-categories': 'List habit categories { id, label }',
+        'POST /api/user/habit-categories': 'Add category body { label }',
+        'PATCH /api/user/habit-categories': 'Rename category body { id, label }',
+        'DELETE /api/user/habit-categories': 'Delete category body { id, reassignTo? }',
+        'GET /health': 'Health check endpoint',
+        'GET /api/user/todos': 'List your todos',
+        'POST /api/user/todos': 'Add todo item body { text }',
+        'DELETE /api/user/todos': 'Delete todo body { todoId }',
+        'GET /api/user/flashcards': 'List flashcard groups and cards',
+        'PUT /api/user/flashcards': 'Replace all flashcard groups body { groups: [...] }',
+        'POST /api/user/flashcards/groups': 'Add a flashcard group body { name }',
+        'POST /api/user/flashcards/cards': 'Add a card body { groupId, front, back }',
+        'GET /api/user/flashcards/study': 'Get randomized cards (optional ?groupId=...)',
+        'GET /api/user/nutrition': 'Get calorie/weight/water history map',
+        'PUT /api/user/nutrition': 'Replace calorie/weight/water history body { history }',
+        'GET /api/user/stoic': 'Get current stoic journal entry',
+        'PUT /api/user/stoic': 'Replace stoic journal entry body { date, form }',
+        'GET /api/user/day-planner/options': 'List day planner dropdown options',
+        'POST /api/user/day-planner/options': 'Add option body { label }',
+        'PATCH /api/user/day-planner/options': 'Edit option body { id, label }',
+        'DELETE /api/user/day-planner/options': 'Delete option body { id }',
+        'GET /api/user/day-planner/daily': 'Get today slot selections { date, slots }',
+        'PUT /api/user/day-planner/daily': 'Save slots body { date, slots: { "0": optionId, ... } }',
+        'GET /api/user/meal-plan': 'Get trainer meal sections and today selection/completion entry',
+        'PUT /api/user/meal-plan': 'Save today meal entry body { date, selections, completed }',
+        'GET /': 'This information endpoint'
+    },
+}
+
+_HEALTH_CHECKS = {
+    'app_running': True,
+    'timestamp': True
+}
+
+
+@lru_cache(maxsize=1)
+def _root_body(timestamp):
+    return app.json.dumps({
+        **_API_INFO,
+        'timestamp': timestamp
+    }) + "\n"
+
+
+@lru_cache(maxsize=1)
+def _health_body(timestamp):
+    return app.json.dumps({
+        'status': 'healthy',
+        'timestamp': timestamp,
+        'checks': _HEALTH_CHECKS
+    }) + "\n"
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    start_time = time.time()
-
-    logger.info("Health check request received", extra={
-        "operation": "health_check",
-        "endpoint": "/health",
-        "method": "GET"
-    })
+    start_time = time.perf_counter_ns()
 
     try:
-        # Basic health checks
-        health_status = {
-            'status': 'healthy',
-            'timestamp': datetime.now().isoformat(),
-            'checks': {
-                'app_running': True,
-                'timestamp': True
-            }
-        }
-
-        duration = (time.time() - start_time) * 1000
-        logger.info("Health check completed", extra={
-            "operation": "health_check",
-            "status": "healthy",
-            "duration_ms": round(duration, 2)
-        })
+        # Basic health checks; body is reused for every probe within the same second
+        body = _health_body(iso_now())
 
-        return jsonify(health_status), 200
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Health check completed", extra={
+                "operation": "health_check",
+                "endpoint": "/health",
+                "status": "healthy",
+                "duration_ms": _elapsed_ms(start_time)
+            })
+
+        return app.response_class(body, mimetype='application/json'), 200
 
     except Exception as e:
-        duration = (time.time() - start_time) * 1000
         logger.error("Health check failed", extra={
             "operation": "health_check",
             "error": str(e),
-            "duration_ms": round(duration, 2),
+            "duration_ms": _elapsed_ms(start_time),
             "status": "unhealthy"
         })
 
         return jsonify({
             'status': 'unhealthy',
             'error': str(e),
-            'timestamp': datetime.now().isoformat()
+            'timestamp': iso_now()
         }), 500
 
 @app.route('/', methods=['GET'])
 def root():
     """Root endpoint with API information"""
-    start_time = time.time()
-
-    logger.info("Root endpoint request received", extra={
-        "operation": "root",
-        "endpoint": "/",
-        "method": "GET"
-    })
+    start_time = time.perf_counter_ns()
 
     try:
-        api_info = {
-            'message': 'Portfolio Auth API',
-            'version': '1.0.0',
-            'endpoints': {
-                'POST /api/auth/register': 'Register with email and password (password stored as hash)',
-                'POST /api/auth/login': 'Login; returns JWT bearer token',
-                'GET /api/auth/me': 'Current user from Authorization: Bearer <token>',
-                'DELETE /api/auth/account': 'Delete account; JSON body { password } required',
-                'GET /api/habits': 'Habit tracker cells for current user (JSON map)',
-                'PUT /api/habits': 'Merge habit cells body { cells: { "YYYY-MM-DD_id": "done"|"none" } }',
-                'PATCH /api/habits/cell': 'Set one cell { date, habitId, state }',
-                'GET /api/user/habits': 'List habit definitions { id, label, category }',
-                'PUT /api/user/habits': 'Replace habits body { habits: [...] }; category must exist',
-                'GET /api/user/habit-categories': 'List habit categories { id, label }',
-                'POST /api/user/habit-categories': 'Add category body { label }',
-                'PATCH /api/user/habit-categories': 'Rename category body { id, label }',
-                'DELETE /api/user/habit-categories': 'Delete category body { id, reassignTo? }',
-                'GET /health': 'Health check endpoint',
-                'GET /api/user/todos': 'List your todos',
-                'POST /api/user/todos': 'Add todo item body { text }',
-                'DELETE /api/user/todos': 'Delete todo body { todoId }',
-                'GET /api/user/flashcards': 'List flashcard groups and cards',
-                'PUT /api/user/flashcards': 'Replace all flashcard groups body { groups: [...] }',
-                'POST /api/user/flashcards/groups': 'Add a flashcard group body { name }',
-                'POST /api/user/flashcards/cards': 'Add a card body { groupId, front, back }',
-                'GET /api/user/flashcards/study': 'Get randomized cards (optional ?groupId=...)',
-                'GET /api/user/nutrition': 'Get calorie/weight/water history map',
-                'PUT /api/user/nutrition': 'Replace calorie/weight/water history body { history }',
-                'GET /api/user/stoic': 'Get current stoic journal entry',
-                'PUT /api/user/stoic': 'Replace stoic journal entry body { date, form }',
-                'GET /api/user/day-planner/options': 'List day planner dropdown options',
-                'POST /api/user/day-planner/options': 'Add option body { label }',
-                'PATCH /api/user/day-planner/options': 'Edit option body { id, label }',
-                'DELETE /api/user/day-planner/options': 'Delete option body { id }',
-                'GET /api/user/day-planner/daily': 'Get today slot selections { date, slots }',
-                'PUT /api/user/day-planner/daily': 'Save slots body { date, slots: { "0": optionId, ... } }',
-                'GET /api/user/meal-plan': 'Get trainer meal sections and today selection/completion entry',
-                'PUT /api/user/meal-plan': 'Save today meal entry body { date, selections, completed }',
-                'GET /': 'This information endpoint'
-            },
-            'timestamp': datetime.now().isoformat()
-        }
-
-        duration = (time.time() - start_time) * 1000
-        logger.info("Root endpoint completed", extra={
-            "operation": "root",
-            "duration_ms": round(duration, 2),
-            "status": "success"
-        })
+        body = _root_body(iso_now())
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Root endpoint completed", extra={
+                "operation": "root",
+                "endpoint": "/",
+                "duration_ms": _elapsed_ms(start_time),
+                "status": "success"
+            })
 
-        return jsonify(api_info), 200
+        return app.response_class(body, mimetype='application/json'), 200
 
     except Exception as e:
-        duration = (time.time() - start_time) * 1000
         logger.error("Root endpoint failed", extra={
             "operation": "root",
             "error": str(e),
-            "duration_ms": round(duration, 2),
+            "duration_ms": _elapsed_ms(start_time),
             "status": "error"
         })
 
         return jsonify({
             'error': 'Failed to retrieve API information',
-            'timestamp': datetime.now().isoformat()
+            'timestamp': iso_now()
         }), 500
 
 # Error handlers
@@ -802,7 +882,7 @@ def not_found(error):
         'error': 'Endpoint not found',
         'path': request.path,
         'method': request.method,
-        'timestamp': datetime.now().isoformat()
+        'timestamp': iso_now()
     }), 404
 
 @app.errorhandler(500)
@@ -817,7 +897,7 @@ def internal_error(error):
     })
     return jsonify({
         'error': 'Internal server error',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': iso_now()
     }), 500
 
 if __name__ == '__main__':
@@ -1,10 +1,14 @@
+import logging
 import os
+import time
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 
 import jwt
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from services.firebase_service import create_user_record, get_user_record, initialize_firebase
+from services.firebase.db_state import EMAIL_KEY_RE
 from services.logging_service import logger
 
 initialize_firebase()
@@ -12,9 +16,13 @@ initialize_firebase()
 MIN_PASSWORD_LENGTH = 8
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRY_DAYS = 7
+# Verified tokens kept per process; read once at import.
+JWT_DECODE_CACHE_SIZE = int(os.environ.get("JWT_DECODE_CACHE_SIZE", 1024))
 
 
+@lru_cache(maxsize=1)
 def _jwt_secret():
+    """Resolved once per process; the insecure-default warning is logged a single time."""
     secret = os.environ.get("JWT_SECRET_KEY")
     if not secret:
         secret = "dev-only-insecure-jwt-secret"
@@ -46,24 +54,48 @@ def create_access_token(email):
     return jwt.encode(payload, _jwt_secret(), algorithm=JWT_ALGORITHM)
 
 
+@lru_cache(maxsize=JWT_DECODE_CACHE_SIZE)
+def _verified_claims(token):
+    """
+    Signature-checked (sub, exp) for a token. Expiry is checked by the caller so cached tokens still expire;
+    exp is validated here the way PyJWT does (int() or DecodeError), since verify_exp is off.
+    """
+    data = jwt.decode(
+        token,
+        _jwt_secret(),
+        algorithms=[JWT_ALGORITHM],
+        options={"verify_exp": False},
+    )
+    exp = data.get("exp")
+    if "exp" in data:
+        try:
+            exp = int(exp)
+        except (TypeError, ValueError):
+            raise jwt.DecodeError("Expiration Time claim (exp) must be an integer.") from None
+    return data.get("sub"), exp
+
+
 def decode_access_token(token):
     if not token:
         return None
     try:
-        data = jwt.decode(token, _jwt_secret(), algorithms=[JWT_ALGORITHM])
-        sub = data.get("sub")
+        sub, exp = _verified_claims(token)
+        if exp is not None and exp <= time.time():
+            raise jwt.ExpiredSignatureError("Signature has expired")
         return sub if isinstance(sub, str) else None
     except jwt.PyJWTError as e:
-        logger.info("JWT decode failed", extra={
-            "operation": "decode_access_token",
-            "error": str(e),
-        })
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("JWT decode failed", extra={
+                "operation": "decode_access_token",
+                "error": str(e),
+            })
         return None
 
 
 def register_user(email, password):
     email_norm = (email or "").strip().lower()
-    if not email_norm or "@" not in email_norm or len(email_norm) > 320:
+    # Same shape check as lookups, so every account that registers can also sign in.
+    if not email_norm or not EMAIL_KEY_RE.match(email_norm):
         return None, "invalid_email", None
     if not password or len(password) < MIN_PASSWORD_LENGTH:
         return None, "weak_password", None
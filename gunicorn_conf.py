@@ -0,0 +1,19 @@
+"""
+Gunicorn settings for Janus (Docker / Google Cloud Run).
+
+Requests spend most of their time waiting on Firestore, so each worker runs a
+thread pool (gthread). gevent is avoided because the Firestore client talks gRPC,
+which does not cooperate with gevent monkey-patching.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+worker_class = "gthread"
+# Cloud Run instances get 1 vCPU by default, and os.cpu_count() inside a container reports the
+# host's cores, so default to a single worker and get concurrency from its threads.
+workers = int(os.environ.get("GUNICORN_WORKERS", 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+keepalive = 5
+# Cloud Run's request timeout does not restart a stuck worker; gunicorn's timeout is what does.
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
@@ -1,4 +1,4 @@
-from .core import initialize_firebase, get_database_status
+from .core import initialize_firebase, get_database_status, open_user_doc_scope
 from .users import create_user_record, get_user_record, delete_user_account
 from .habits import (
     get_habits_map,
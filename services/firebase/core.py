@@ -1,15 +1,32 @@
 import os
+import time
+from concurrent.futures import Future
+from copy import deepcopy
 from firebase_admin import credentials, firestore, initialize_app
-from dotenv import load_dotenv
+from flask import g, has_request_context
+from google.api_core.exceptions import NotFound
+from google.cloud.firestore_v1.field_path import FieldPath
 
 from . import db_state
 from ..logging_service import logger
 
-load_dotenv()
+# Production images get configuration from the environment; only look for a .env file elsewhere.
+if os.environ.get("FLASK_ENV") != "production":
+    from dotenv import load_dotenv
+
+    load_dotenv()
 
 
 def initialize_firebase():
-    """Initialize Firebase Admin SDK with Google Cloud automatic authentication."""
+    """Initialize Firebase Admin SDK with Google Cloud automatic authentication.
+
+    Idempotent: the app and Firestore client are process-wide singletons, and a second
+    initialize_app() call would raise and wrongly drop us to in-memory storage.
+    """
+    if db_state.firebase_initialized:
+        return
+    db_state.firebase_initialized = True
+
     try:
         initialize_app()
         logger.info("Firebase initialization successful", extra={
@@ -92,10 +109,143 @@ def normalize_user_email(email):
     return (email or "").strip().lower()
 
 
+def open_user_doc_scope():
+    """
+    Start the current request's view of user documents (registered as a before_request hook).
+    Each document is read from Firestore at most once per request; nothing is kept between
+    requests, because other workers and instances write the same documents.
+    """
+    g.user_docs = {}
+    g.user_docs_since = time.monotonic_ns()
+
+
+def _request_docs():
+    """The current request's email -> document (or None) memo, or None outside a request scope."""
+    if has_request_context():
+        return g.get("user_docs")
+    return None
+
+
+def _fetch_user_doc(email_key, since):
+    """
+    Read the user document from Firestore. Concurrent callers may share one read, but only
+    one issued at or after `since` (their request start), so it reflects every write
+    committed before they began. `since=None` never joins another read.
+    """
+    with db_state.user_doc_cache_lock:
+        entry = db_state.user_doc_inflight.get(email_key)
+        if since is not None and entry is not None and entry[0] >= since:
+            pending = entry[1]
+            leader = False
+        else:
+            pending = Future()
+            db_state.user_doc_inflight[email_key] = (time.monotonic_ns(), pending)
+            leader = True
+
+    if not leader:
+        return pending.result()
+
+    try:
+        doc = db_state.users_collection_ref.document(email_key).get()
+        data = (doc.to_dict() or {}) if doc.exists else None
+    except Exception as e:
+        _unregister_read(email_key, pending)
+        pending.set_exception(e)
+        raise
+
+    _unregister_read(email_key, pending)
+    pending.set_result(data)
+    return data
+
+
+def _unregister_read(email_key, pending):
+    """Drop the in-flight entry if it is still this read's (a write may already have removed it)."""
+    with db_state.user_doc_cache_lock:
+        entry = db_state.user_doc_inflight.get(email_key)
+        if entry is not None and entry[1] is pending:
+            del db_state.user_doc_inflight[email_key]
+
+
+def read_user_doc(email_key):
+    """
+    Firestore user document as a dict, or None when it does not exist.
+    Memoised (including "missing") for the rest of the current request. Firestore errors propagate to the caller.
+    Callers must treat the returned dict as read-only.
+    """
+    docs = _request_docs()
+    if docs is None:
+        return _fetch_user_doc(email_key, None)
+    if email_key not in docs:
+        docs[email_key] = _fetch_user_doc(email_key, g.user_docs_since)
+    return docs[email_key]
+
+
+def _merge_fields(base, fields):
+    """Copy of base with fields applied the way set(..., merge=True) does: non-empty maps merge, anything else replaces."""
+    out = dict(base)
+    for key, value in fields.items():
+        if isinstance(value, dict) and value:
+            child = out.get(key)
+            out[key] = _merge_fields(child if isinstance(child, dict) else {}, value)
+        else:
+            out[key] = deepcopy(value)
+    return out
+
+
+def _leaf_field_paths(fields, parents=()):
+    """Field-path -> value pairs for fields, split into leaves the way set(..., merge=True) does."""
+    out = {}
+    for key, value in fields.items():
+        path = (*parents, key)
+        if isinstance(value, dict) and value:
+            out.update(_leaf_field_paths(value, path))
+        else:
+            out[FieldPath(*path).to_api_repr()] = value
+    return out
+
+
+def write_user_fields(email_key, fields):
+    """
+    Merge fields into the user's existing Firestore document and into the current request's copy,
+    so a read later in the same request (e.g. after a category migration) needs no round trip.
+    Uses update() on the merge=True leaf paths, so Firestore rejects the write when the document
+    has been deleted (no field-only "zombie" user is recreated). Returns False in that case.
+    Other requests always read Firestore. Other Firestore errors propagate to the caller.
+    """
+    try:
+        db_state.users_collection_ref.document(email_key).update(_leaf_field_paths(fields))
+        written = True
+    except NotFound:
+        written = False
+    with db_state.user_doc_cache_lock:
+        db_state.user_doc_inflight.pop(email_key, None)
+    docs = _request_docs()
+    if docs is not None:
+        cached = docs.get(email_key)
+        if not written:
+            docs[email_key] = None
+        elif cached is None:
+            docs.pop(email_key, None)
+        else:
+            docs[email_key] = _merge_fields(cached, fields)
+    return written
+
+
+def forget_user_doc(email_key):
+    """Drop this request's copy after a write so the next read goes to Firestore; later readers won't join an older read."""
+    with db_state.user_doc_cache_lock:
+        db_state.user_doc_inflight.pop(email_key, None)
+    docs = _request_docs()
+    if docs is not None:
+        docs.pop(email_key, None)
+
+
 def user_exists(email_key):
+    if not db_state.EMAIL_KEY_RE.match(email_key):
+        return False
     if db_state.users_collection_ref:
         try:
-            if db_state.users_collection_ref.document(email_key).get().exists:
+            if read_user_doc(email_key) is not None:
                 return True
         except Exception as e:
             logger.error("Firestore user exists check failed", extra={
@@ -1,7 +1,7 @@
 import uuid
 
 from . import db_state
-from .core import normalize_user_email, user_exists
+from .core import normalize_user_email, user_exists, read_user_doc, write_user_fields
 from ..logging_service import logger
 
 OPTION_LABEL_MAX_LEN = 120
@@ -51,9 +51,8 @@ def _normalize_slots(raw, valid_ids):
 def _read_options_from_store(email_key):
     if db_state.users_collection_ref:
         try:
-            doc = db_state.users_collection_ref.document(email_key).get()
-            if doc.exists:
-                data = doc.to_dict() or {}
+            data = read_user_doc(email_key)
+            if data is not None:
                 return _normalize_options(data.get("day_planner_options_v1"))
         except Exception as e:
             logger.error("Firestore day planner options read failed", extra={
@@ -66,10 +65,8 @@ def _read_options_from_store(email_key):
 def _write_options(email_key, options_list):
     if db_state.users_collection_ref:
         try:
-            doc_ref = db_state.users_collection_ref.document(email_key)
-            if not doc_ref.get().exists:
+            if not write_user_fields(email_key, {"day_planner_options_v1": options_list}):
                 return False
-            doc_ref.set({"day_planner_options_v1": options_list}, merge=True)
             return True
         except Exception as e:
             logger.error("Firestore day planner options write failed", extra={
@@ -174,9 +171,9 @@ def _read_day_planner_daily_unvalidated(email_key):
     payload = None
     if db_state.users_collection_ref:
         try:
-            doc = db_state.users_collection_ref.document(email_key).get()
-            if doc.exists:
-                payload = (doc.to_dict() or {}).get("day_planner_daily_v1")
+            data = read_user_doc(email_key)
+            if data is not None:
+                payload = data.get("day_planner_daily_v1")
         except Exception as e:
             logger.error("Firestore day planner daily read failed", extra={
                 "operation": "_read_day_planner_daily_unvalidated",
@@ -210,9 +207,8 @@ def get_day_planner_daily(email):
     payload = None
     if db_state.users_collection_ref:
         try:
-            doc = db_state.users_collection_ref.document(email_key).get()
-            if doc.exists:
-                data = doc.to_dict() or {}
+            data = read_user_doc(email_key)
+            if data is not None:
                 payload = data.get("day_planner_daily_v1")
         except Exception as e:
             logger.error("Firestore day planner daily read failed", extra={
@@ -243,10 +239,8 @@ def update_day_planner_daily(email, date_key, slots):
 
     if db_state.users_collection_ref:
         try:
-            doc_ref = db_state.users_collection_ref.document(email_key)
-            if not doc_ref.get().exists:
+            if not write_user_fields(email_key, {"day_planner_daily_v1": payload}):
                 return False, "no_user", None
-            doc_ref.set({"day_planner_daily_v1": payload}, merge=True)
             return True, None, payload
         except Exception as e:
             logger.error("Firestore day planner daily write failed", extra={
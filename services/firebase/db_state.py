@@ -1,14 +1,25 @@
 import re
+from threading import RLock
 
 # Shared regex validators
 DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
 CELL_KEY_RE = re.compile(r"^(\d{4}-\d{2}-\d{2})_(.+)$")
 TODO_ID_RE = re.compile(r"^[a-zA-Z0-9_\-]{1,64}$")
+HABIT_ID_RE = re.compile(r"^[a-zA-Z0-9_\-]+$")
+# Loose shape check used to skip Firestore lookups for keys no registered user can have.
+EMAIL_KEY_RE = re.compile(r"^(?=.{3,320}$)[^/]+@[^/]+$")
 
 # Global database handles
+firebase_initialized = False
 db = None
 users_collection_ref = None
 
+# User documents are memoised per request on flask.g (see core.open_user_doc_scope), never
+# across requests: other workers and instances write the same documents.
+user_doc_cache_lock = RLock()
+# email -> (issued_at_ns, Future) for a Firestore read currently in progress (request coalescing).
+user_doc_inflight = {}
+
 # In-memory fallback stores
 auth_users_memory = {}
 habit_memory = {}
@@ -2,7 +2,7 @@ import random
 import uuid
 
 from . import db_state
-from .core import normalize_user_email, user_exists
+from .core import normalize_user_email, user_exists, read_user_doc, write_user_fields
 from ..logging_service import logger
 
 FLASHCARD_GROUP_NAME_MAX_LEN = 80
@@ -71,9 +71,8 @@ def get_flashcard_groups(email):
         return []
     if db_state.users_collection_ref:
         try:
-            doc = db_state.users_collection_ref.document(email_key).get()
-            if doc.exists:
-                data = doc.to_dict() or {}
+            data = read_user_doc(email_key)
+            if data is not None:
                 return _normalize_flashcard_groups(data.get("flashcards_v1"))
         except Exception as e:
             logger.error("Firestore flashcards read failed", extra={
@@ -86,10 +85,8 @@ def get_flashcard_groups(email):
 def _write_flashcard_groups(email_key, groups):
     if db_state.users_collection_ref:
         try:
-            doc_ref = db_state.users_collection_ref.document(email_key)
-            if not doc_ref.get().exists:
+            if not write_user_fields(email_key, {"flashcards_v1": groups}):
                 return False
-            doc_ref.set({"flashcards_v1": groups}, merge=True)
             return True
         except Exception as e:
             logger.error("Firestore flashcards write failed", extra={
@@ -1,7 +1,7 @@
 import uuid
 
 from . import db_state
-from .core import normalize_user_email, user_exists
+from .core import normalize_user_email, user_exists, read_user_doc, write_user_fields
 from ..logging_service import logger
 
 CATEGORY_LABEL_MAX_LEN = 80
@@ -39,9 +39,8 @@ def _normalize_categories_list(items):
 def _read_raw_categories_list(email_key):
     if db_state.users_collection_ref:
         try:
-            doc = db_state.users_collection_ref.document(email_key).get()
-            if doc.exists:
-                data = doc.to_dict() or {}
+            data = read_user_doc(email_key)
+            if data is not None:
                 h = data.get("habit_categories_v1")
                 return h if isinstance(h, list) else []
         except Exception as e:
@@ -53,13 +52,12 @@ def _read_raw_categories_list(email_key):
     return list(db_state.habit_categories_memory.get(email_key, []))
 
 
-def _write_categories_list(email_key, categories_list):
+def _write_categories_list(email_key, categories_list, habit_fields=None):
+    """Save the category list; habit_fields (from custom_habits_payload) go in the same write."""
     if db_state.users_collection_ref:
         try:
-            doc_ref = db_state.users_collection_ref.document(email_key)
-            if not doc_ref.get().exists:
+            if not write_user_fields(email_key, {"habit_categories_v1": categories_list, **(habit_fields or {})}):
                 return False
-            doc_ref.set({"habit_categories_v1": categories_list}, merge=True)
             return True
         except Exception as e:
             logger.error("Firestore habit categories write failed", extra={
@@ -70,6 +68,10 @@ def _write_categories_list(email_key, categories_list):
     if email_key not in db_state.auth_users_memory:
         return False
     db_state.habit_categories_memory[email_key] = list(categories_list)
+    if habit_fields:
+        from .habits import store_custom_habits_memory
+
+        store_custom_habits_memory(email_key, habit_fields)
     return True
 
 
@@ -166,9 +168,10 @@ def delete_habit_category(email, category_id, reassign_to_id=None):
     if not isinstance(category_id, str) or not db_state.TODO_ID_RE.match(category_id):
         return False, "invalid_id", None
 
-    from .habits import get_custom_habits, update_custom_habits
+    from .habits import get_custom_habits, custom_habits_payload
 
     habits = get_custom_habits(email)
+    habit_fields = None
     if any(h["category"] == category_id for h in habits):
         if not isinstance(reassign_to_id, str) or not db_state.TODO_ID_RE.match(reassign_to_id):
             return False, "category_in_use", None
@@ -181,14 +184,15 @@ def delete_habit_category(email, category_id, reassign_to_id=None):
             {**h, "category": reassign_to_id if h["category"] == category_id else h["category"]}
             for h in habits
         ]
-        ok, err, _ = update_custom_habits(email, new_habits)
-        if not ok:
-            return False, err or "update_failed", None
+        err, habit_fields, _ = custom_habits_payload(email, email_key, new_habits)
+        if err:
+            return False, err, None
 
     cats = get_habit_categories(email)
     next_cats = [c for c in cats if c["id"] != category_id]
     if len(next_cats) == len(cats):
         return False, "not_found", None
-    if not _write_categories_list(email_key, next_cats):
+    # Reassigned habits and the shorter category list are saved in one write.
+    if not _write_categories_list(email_key, next_cats, habit_fields):
         return False, "write_failed", None
     return True, None, next_cats
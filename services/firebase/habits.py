@@ -1,7 +1,5 @@
-import re
-
 from . import db_state
-from .core import normalize_user_email, user_exists
+from .core import normalize_user_email, user_exists, read_user_doc, write_user_fields
 from ..logging_service import logger
 
 HABIT_LABEL_MAX_LEN = 120
@@ -12,9 +10,8 @@ def read_raw_custom_habits_list(email_key):
     """Raw custom_habits_v1 list from storage (for category migration)."""
     if db_state.users_collection_ref:
         try:
-            doc = db_state.users_collection_ref.document(email_key).get()
-            if doc.exists:
-                data = doc.to_dict() or {}
+            data = read_user_doc(email_key)
+            if data is not None:
                 h = data.get("custom_habits_v1")
                 return h if isinstance(h, list) else []
         except Exception as e:
@@ -31,7 +28,7 @@ def _normalize_custom_habit(h, valid_category_ids=None):
     if not isinstance(h, dict):
         return None
     hid = h.get("id")
-    if not isinstance(hid, str) or not re.match(r"^[a-zA-Z0-9_\-]+$", hid):
+    if not isinstance(hid, str) or not db_state.HABIT_ID_RE.match(hid):
         return None
     label = h.get("label")
     if not isinstance(label, str) or not label.strip():
@@ -52,9 +49,8 @@ def _read_raw_habits_map(email_key):
     """Full habits_v1 dict as stored (before normalize)."""
     if db_state.users_collection_ref:
         try:
-            doc = db_state.users_collection_ref.document(email_key).get()
-            if doc.exists:
-                data = doc.to_dict() or {}
+            data = read_user_doc(email_key)
+            if data is not None:
                 h = data.get("habits_v1")
                 if isinstance(h, dict):
                     return dict(h)
@@ -95,7 +91,7 @@ def _normalize_habits_dict(raw):
         if not m:
             continue
         date_str, habit_id = m.group(1), m.group(2)
-        if not re.match(r"^[a-zA-Z0-9_\-]+$", habit_id):
+        if not db_state.HABIT_ID_RE.match(habit_id):
             continue
         if not db_state.DATE_RE.match(date_str):
             continue
@@ -112,9 +108,8 @@ def get_habits_map(email):
 
     if db_state.users_collection_ref:
         try:
-            doc = db_state.users_collection_ref.document(email_key).get()
-            if doc.exists:
-                data = doc.to_dict() or {}
+            data = read_user_doc(email_key)
+            if data is not None:
                 h = data.get("habits_v1")
                 return _normalize_habits_dict(h) if isinstance(h, dict) else {}
         except Exception as e:
@@ -129,10 +124,8 @@ def get_habits_map(email):
 def _write_habits_map(email_key, habits_dict):
     if db_state.users_collection_ref:
         try:
-            doc_ref = db_state.users_collection_ref.document(email_key)
-            if not doc_ref.get().exists:
+            if not write_user_fields(email_key, {"habits_v1": habits_dict}):
                 return False
-            doc_ref.set({"habits_v1": habits_dict}, merge=True)
             return True
         except Exception as e:
             logger.error("Firestore habits write failed", extra={
@@ -151,7 +144,7 @@ def patch_habit_cell(email, date_str, habit_id, state):
     email_key = normalize_user_email(email)
     if not email_key or not user_exists(email_key):
         return False, "no_user"
-    if not re.match(r"^[a-zA-Z0-9_\-]+$", str(habit_id)):
+    if not db_state.HABIT_ID_RE.match(str(habit_id)):
         return False, "invalid_habit"
     if not db_state.DATE_RE.match(date_str or ""):
         return False, "invalid_date"
@@ -187,7 +180,7 @@ def merge_habits_map(email, incoming):
         if not m:
             continue
         date_str, habit_id = m.group(1), m.group(2)
-        if not re.match(r"^[a-zA-Z0-9_\-]+$", str(habit_id)):
+        if not db_state.HABIT_ID_RE.match(str(habit_id)):
             continue
         if v == "none":
             habits.pop(k, None)
@@ -207,9 +200,8 @@ def get_custom_habits(email):
     raw = []
     if db_state.users_collection_ref:
         try:
-            doc = db_state.users_collection_ref.document(email_key).get()
-            if doc.exists:
-                data = doc.to_dict() or {}
+            data = read_user_doc(email_key)
+            if data is not None:
                 h = data.get("custom_habits_v1")
                 raw = h if isinstance(h, list) else []
         except Exception as e:
@@ -229,26 +221,25 @@ def get_custom_habits(email):
     return out
 
 
-def update_custom_habits(email, habits_list):
+def custom_habits_payload(email, email_key, habits_list):
+    """
+    Validate a full custom habits list and build the document fields that save it.
+    Returns (error_code, fields, valid_habits); fields also carry the pruned habits_v1 map
+    when habits were removed.
+    """
     from .habit_categories import get_category_id_set
 
-    email_key = normalize_user_email(email)
-    if not email_key or not user_exists(email_key):
-        return False, "no_user", None
-    if not isinstance(habits_list, list):
-        return False, "invalid_body", None
-
     valid_category_ids = get_category_id_set(email)
     if len(habits_list) > 0 and not valid_category_ids:
-        return False, "no_categories", None
+        return "no_categories", None, None
 
     valid_habits = []
     for h in habits_list:
         if not isinstance(h, dict):
-            return False, "invalid_body", None
+            return "invalid_body", None, None
         n = _normalize_custom_habit(h, valid_category_ids)
         if n is None:
-            return False, "invalid_habit", None
+            return "invalid_habit", None, None
         valid_habits.append(n)
 
     previous = get_custom_habits(email)
@@ -261,13 +252,31 @@ def update_custom_habits(email, habits_list):
         raw_cells = _read_raw_habits_map(email_key)
         stripped = _strip_habit_cells(raw_cells, removed_ids)
         payload["habits_v1"] = _normalize_habits_dict(stripped)
+    return None, payload, valid_habits
+
+
+def store_custom_habits_memory(email_key, payload):
+    """Apply fields from custom_habits_payload to the in-memory stores."""
+    db_state.custom_habits_memory[email_key] = list(payload["custom_habits_v1"])
+    if "habits_v1" in payload:
+        db_state.habit_memory[email_key] = dict(payload["habits_v1"])
+
+
+def update_custom_habits(email, habits_list):
+    email_key = normalize_user_email(email)
+    if not email_key or not user_exists(email_key):
+        return False, "no_user", None
+    if not isinstance(habits_list, list):
+        return False, "invalid_body", None
+
+    err, payload, valid_habits = custom_habits_payload(email, email_key, habits_list)
+    if err:
+        return False, err, None
 
     if db_state.users_collection_ref:
         try:
-            doc_ref = db_state.users_collection_ref.document(email_key)
-            if not doc_ref.get().exists:
+            if not write_user_fields(email_key, payload):
                 return False, "no_user", None
-            doc_ref.set(payload, merge=True)
             return True, None, valid_habits
         except Exception as e:
             logger.error("Firestore custom habits write failed", extra={
@@ -278,7 +287,5 @@ def update_custom_habits(email, habits_list):
 
     if email_key not in db_state.auth_users_memory:
         return False, "no_user", None
-    db_state.custom_habits_memory[email_key] = list(valid_habits)
-    if removed_ids:
-        db_state.habit_memory[email_key] = dict(payload["habits_v1"])
+    store_custom_habits_memory(email_key, payload)
     return True, None, valid_habits
@@ -1,7 +1,7 @@
 from copy import deepcopy
 
 from . import db_state
-from .core import normalize_user_email, user_exists
+from .core import normalize_user_email, user_exists, read_user_doc, write_user_fields
 from ..logging_service import logger
 
 SECTION_ON_RISING = "onRising"
@@ -131,9 +131,9 @@ def get_meal_plan_daily(email):
     payload = None
     if db_state.users_collection_ref:
         try:
-            doc = db_state.users_collection_ref.document(email_key).get()
-            if doc.exists:
-                payload = (doc.to_dict() or {}).get("meal_plan_daily_v1")
+            data = read_user_doc(email_key)
+            if data is not None:
+                payload = data.get("meal_plan_daily_v1")
         except Exception as e:
             logger.error("Firestore meal plan read failed", extra={
                 "operation": "get_meal_plan_daily",
@@ -158,10 +158,8 @@ def update_meal_plan_daily(email, date_key, selections, completed):
 
     if db_state.users_collection_ref:
         try:
-            doc_ref = db_state.users_collection_ref.document(email_key)
-            if not doc_ref.get().exists:
+            if not write_user_fields(email_key, {"meal_plan_daily_v1": payload}):
                 return False, "no_user", None
-            doc_ref.set({"meal_plan_daily_v1": payload}, merge=True)
             return True, None, payload
         except Exception as e:
             logger.error("Firestore meal plan write failed", extra={
@@ -1,5 +1,5 @@
 from . import db_state
-from .core import normalize_user_email, user_exists
+from .core import normalize_user_email, user_exists, read_user_doc, write_user_fields
 from ..logging_service import logger
 
 NUTRITION_MAX_DAYS = 400
@@ -37,9 +37,8 @@ def get_nutrition_history(email):
         return {}
     if db_state.users_collection_ref:
         try:
-            doc = db_state.users_collection_ref.document(email_key).get()
-            if doc.exists:
-                data = doc.to_dict() or {}
+            data = read_user_doc(email_key)
+            if data is not None:
                 return _normalize_nutrition_history(data.get("nutrition_v1"))
         except Exception as e:
             logger.error("Firestore nutrition read failed", extra={
@@ -60,10 +59,8 @@ def update_nutrition_history(email, history):
 
     if db_state.users_collection_ref:
         try:
-            doc_ref = db_state.users_collection_ref.document(email_key)
-            if not doc_ref.get().exists:
+            if not write_user_fields(email_key, {"nutrition_v1": normalized}):
                 return False, "no_user", None
-            doc_ref.set({"nutrition_v1": normalized}, merge=True)
             return True, None, normalized
         except Exception as e:
             logger.error("Firestore nutrition write failed", extra={
@@ -1,5 +1,5 @@
 from . import db_state
-from .core import normalize_user_email, user_exists
+from .core import normalize_user_email, user_exists, read_user_doc, write_user_fields
 from ..logging_service import logger
 
 STOIC_TEXT_MAX_LEN = 1200
@@ -30,9 +30,8 @@ def get_stoic_journal(email):
     payload = None
     if db_state.users_collection_ref:
         try:
-            doc = db_state.users_collection_ref.document(email_key).get()
-            if doc.exists:
-                data = doc.to_dict() or {}
+            data = read_user_doc(email_key)
+            if data is not None:
                 payload = data.get("stoic_v1")
         except Exception as e:
             logger.error("Firestore stoic read failed", extra={
@@ -60,10 +59,8 @@ def update_stoic_journal(email, date_key, form):
 
     if db_state.users_collection_ref:
         try:
-            doc_ref = db_state.users_collection_ref.document(email_key)
-            if not doc_ref.get().exists:
+            if not write_user_fields(email_key, {"stoic_v1": payload}):
                 return False, "no_user", None
-            doc_ref.set({"stoic_v1": payload}, merge=True)
             return True, None, payload
         except Exception as e:
             logger.error("Firestore stoic write failed", extra={
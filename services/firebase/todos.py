@@ -1,7 +1,7 @@
 import uuid
 
 from . import db_state
-from .core import normalize_user_email, user_exists
+from .core import normalize_user_email, user_exists, read_user_doc, write_user_fields
 from ..logging_service import logger
 
 TODO_TEXT_MAX_LEN = 240
@@ -34,9 +34,8 @@ def get_todos(email):
         return []
     if db_state.users_collection_ref:
         try:
-            doc = db_state.users_collection_ref.document(email_key).get()
-            if doc.exists:
-                data = doc.to_dict() or {}
+            data = read_user_doc(email_key)
+            if data is not None:
                 return _normalize_todos_list(data.get("todos_v1"))
         except Exception as e:
             logger.error("Firestore todos read failed", extra={
@@ -49,10 +48,8 @@ def get_todos(email):
 def _write_todos_list(email_key, todos_list):
     if db_state.users_collection_ref:
         try:
-            doc_ref = db_state.users_collection_ref.document(email_key)
-            if not doc_ref.get().exists:
+            if not write_user_fields(email_key, {"todos_v1": todos_list}):
                 return False
-            doc_ref.set({"todos_v1": todos_list}, merge=True)
             return True
         except Exception as e:
             logger.error("Firestore todos write failed", extra={
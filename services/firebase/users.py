@@ -1,31 +1,36 @@
-from firebase_admin import firestore
+import logging
+from datetime import datetime, timezone
+
+from google.api_core.exceptions import AlreadyExists
 
 from . import db_state
-from .core import normalize_user_email
+from .core import normalize_user_email, read_user_doc, forget_user_doc
 from ..logging_service import logger
 
 
 def create_user_record(email, password_hash):
     email_key = normalize_user_email(email)
-    if not email_key or "@" not in email_key:
+    if not email_key or not db_state.EMAIL_KEY_RE.match(email_key):
         return False, "invalid_email"
 
     if db_state.users_collection_ref:
         try:
-            doc_ref = db_state.users_collection_ref.document(email_key)
-            if doc_ref.get().exists:
-                return False, "exists"
-            doc_ref.set({
+            # create() fails with AlreadyExists, so the existence check and write are one keyed RPC.
+            db_state.users_collection_ref.document(email_key).create({
                 "email": email_key,
                 "password_hash": password_hash,
-                "created_at": firestore.SERVER_TIMESTAMP,
-            })
-            logger.info("User stored in Firestore", extra={
-                "operation": "create_user_record",
-                "email": email_key,
-                "status": "success",
+                "created_at": datetime.now(timezone.utc),
             })
+            forget_user_doc(email_key)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("User stored in Firestore", extra={
+                    "operation": "create_user_record",
+                    "email": email_key,
+                    "status": "success",
+                })
             return True, None
+        except AlreadyExists:
+            return False, "exists"
         except Exception as e:
             logger.error("Firestore user create failed, using memory", extra={
                 "operation": "create_user_record",
@@ -51,14 +56,13 @@ def create_user_record(email, password_hash):
 
 def get_user_record(email):
     email_key = normalize_user_email(email)
-    if not email_key:
+    if not email_key or not db_state.EMAIL_KEY_RE.match(email_key):
         return None
 
     if db_state.users_collection_ref:
         try:
-            doc = db_state.users_collection_ref.document(email_key).get()
-            if doc.exists:
-                data = doc.to_dict() or {}
+            data = read_user_doc(email_key)
+            if data is not None:
                 return {
                     "email": data.get("email", email_key),
                     "password_hash": data.get("password_hash"),
@@ -102,14 +106,15 @@ def delete_user_account(email):
 
     if db_state.users_collection_ref:
         try:
-            doc_ref = db_state.users_collection_ref.document(email_key)
-            if doc_ref.get().exists:
-                doc_ref.delete()
-            logger.info("User account deleted from Firestore", extra={
-                "operation": "delete_user_account",
-                "email": email_key,
-                "status": "success",
-            })
+            # Deleting a missing document is a no-op, so no existence read is needed first.
+            db_state.users_collection_ref.document(email_key).delete()
+            forget_user_doc(email_key)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("User account deleted from Firestore", extra={
+                    "operation": "delete_user_account",
+                    "email": email_key,
+                    "status": "success",
+                })
         except Exception as e:
             logger.error("Firestore user delete failed", extra={
                 "operation": "delete_user_account",
@@ -9,6 +9,7 @@ This module re-exports those APIs so existing imports continue to work.
 from .firebase import (
     initialize_firebase,
     get_database_status,
+    open_user_doc_scope,
     create_user_record,
     get_user_record,
     delete_user_account,
@@ -3,32 +3,60 @@ Logging configuration for Janus (portfolio auth API).
 Supports development, production, and Google Cloud Run.
 """
 
+import atexit
 import os
 import logging
 import logging.config
-from datetime import datetime
+import logging.handlers
+import queue
+import threading
+from functools import lru_cache
 
-# Environment-based logging configuration
-def get_logging_config(environment=None):
+import orjson
+
+# Read once at import; the environment does not change for the life of the process
+_DEFAULT_ENV = os.environ.get('FLASK_ENV', 'production')
+
+# Set once setup_logging has applied a configuration; guarded by _configure_lock
+_configured = False
+_configure_lock = threading.Lock()
+
+# Background threads that own the real (console/file) handlers
+_queue_listeners = []
+
+class OrjsonFormatter(logging.Formatter):
     """
-    Get logging configuration based on environment
-    
-    Args:
-        environment (str): Environment name ('development', 'production', 'cloud_run')
-    
-    Returns:
-        dict: Logging configuration
+    Structured JSON formatter: one record per line with timestamp, level, logger, message,
+    module, function and line. Serialised with orjson, so messages (including tracebacks) are escaped.
     """
-    if not environment:
-        environment = os.environ.get('FLASK_ENV', 'production')
-    
+
+    def format(self, record):
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            message = f"{message}\n{record.exc_text}"
+        if record.stack_info:
+            message = f"{message}\n{self.formatStack(record.stack_info)}"
+        return orjson.dumps({
+            "timestamp": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": message,
+            "module": record.module,
+            "function": record.funcName,
+            "line": record.lineno,
+        }, default=str).decode()
+
+# Environment-based logging configuration
+def _build_logging_config(environment):
     # Base configuration
     base_config = {
         'version': 1,
         'disable_existing_loggers': False,
         'formatters': {
             'structured': {
-                'format': '{"timestamp": "%(asctime)s", "level": "%(levelname)s", "logger": "%(name)s", "message": "%(message)s", "module": "%(module)s", "function": "%(funcName)s", "line": %(lineno)d}',
+                '()': OrjsonFormatter,
                 'datefmt': '%Y-%m-%d %H:%M:%S'
             },
             'simple': {
@@ -109,16 +137,68 @@ def get_logging_config(environment=None):
     
     return base_config
 
+# Built once per known environment; dictConfig only reads these, so they are shared
+_LOGGING_CONFIGS = {
+    env: _build_logging_config(env) for env in ('development', 'production', 'cloud_run')
+}
+
+def get_logging_config(environment=None):
+    """
+    Get logging configuration based on environment
+    
+    Args:
+        environment (str): Environment name ('development', 'production', 'cloud_run')
+    
+    Returns:
+        dict: Logging configuration (shared for known environments; do not modify)
+    """
+    environment = environment or _DEFAULT_ENV
+    config = _LOGGING_CONFIGS.get(environment)
+    if config is None:
+        config = _build_logging_config(environment)
+    return config
+
+def _stop_queue_listeners():
+    """Drain queued records into their handlers and stop the listener threads."""
+    while _queue_listeners:
+        _queue_listeners.pop().stop()
+
+atexit.register(_stop_queue_listeners)
+
+def _move_handlers_to_queue(logger_names):
+    """
+    Put each configured logger behind a QueueHandler so request threads only enqueue
+    records; a QueueListener thread formats and writes them to the original handlers.
+    Loggers sharing the same handler list share one queue and listener.
+    """
+    groups = {}
+    for name in logger_names:
+        target = logging.getLogger(name)
+        if target.handlers:
+            groups.setdefault(tuple(target.handlers), []).append(target)
+
+    for handlers, loggers in groups.items():
+        record_queue = queue.SimpleQueue()
+        queue_handler = logging.handlers.QueueHandler(record_queue)
+        for target in loggers:
+            target.handlers = [queue_handler]
+        listener = logging.handlers.QueueListener(record_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        _queue_listeners.append(listener)
+
 def setup_logging(environment=None):
     """Configure structured logging for Google Cloud Run"""
-    if not environment:
-        environment = os.environ.get('FLASK_ENV', 'production')
+    global _configured
+    environment = environment or _DEFAULT_ENV
     
     # Get configuration
     config = get_logging_config(environment)
     
-    # Apply configuration
+    # Apply configuration (flush any previous listeners first; dictConfig closes their handlers)
+    _stop_queue_listeners()
     logging.config.dictConfig(config)
+    _move_handlers_to_queue([None, *config['loggers']])
+    _configured = True
     
     # Get logger
     logger = logging.getLogger('janus')
@@ -128,7 +208,6 @@ def setup_logging(environment=None):
         "operation": "logging_setup",
         "environment": environment,
         "log_level": logger.level,
-        "timestamp": datetime.utcnow().isoformat()
     })
     
     return logger
@@ -136,6 +215,15 @@ def setup_logging(environment=None):
 # Initialize logger
 logger = setup_logging()
 
+@lru_cache(maxsize=16)
+def _cached_get_logger(name, environment):
+    # Set up logging if not already configured
+    if not _configured:
+        with _configure_lock:
+            if not _configured:
+                setup_logging(environment)
+    return logging.getLogger(name)
+
 def get_logger(name, environment=None):
     """
     Get a configured logger by name
@@ -147,14 +235,7 @@ def get_logger(name, environment=None):
     Returns:
         logging.Logger: Configured logger
     """
-    if not environment:
-        environment = os.environ.get('FLASK_ENV', 'production')
-    
-    # Set up logging if not already configured
-    if not logging.getLogger().handlers:
-        setup_logging(environment)
-    
-    return logging.getLogger(name)
+    return _cached_get_logger(name, environment or _DEFAULT_ENV)
 
 # Convenience functions for common loggers
 def get_janus_logger():
@@ -189,7 +270,6 @@ def set_log_level(logger_name, level):
     logger.info(f"Log level changed to {level.upper()}", extra={
         "operation": "log_level_change",
         "new_level": level.upper(),
-        "timestamp": datetime.utcnow().isoformat()
     })
 
 def enable_debug_logging():
@@ -219,7 +299,6 @@ def log_performance(operation, duration_ms, **kwargs):
     log_data = {
         "operation": operation,
         "duration_ms": round(duration_ms, 2),
-        "timestamp": datetime.utcnow().isoformat(),
         "performance": True
     }
     
@@ -252,8 +331,6 @@ def log_error(operation, error, **kwargs):
         "operation": operation,
         "error": str(error),
         "error_type": type(error).__name__,
-        "timestamp": datetime.utcnow().isoformat(),
-        "error": True
     }
     
     # Add additional context
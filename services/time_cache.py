@@ -0,0 +1,23 @@
+"""
+Shared timestamp helper for response bodies.
+Handlers stamp responses with the current time; at one-second resolution the
+ISO string only needs building once per second.
+"""
+
+import time
+from datetime import datetime, timezone
+
+# (epoch second, ISO string) — swapped as one tuple so threads never see a mismatched pair
+_cached = (0, "")
+
+
+def iso_now():
+    """Current UTC time as an ISO 8601 string, recomputed at most once per second."""
+    global _cached
+    second = int(time.time())
+    cached_second, cached_iso = _cached
+    if second == cached_second:
+        return cached_iso
+    iso = datetime.fromtimestamp(second, timezone.utc).isoformat()
+    _cached = (second, iso)
+    return iso
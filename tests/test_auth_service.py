@@ -0,0 +1,87 @@
+"""
+Tests for access-token decoding in core/auth_service.py, in particular that the per-process
+cache of verified tokens never accepts a token PyJWT itself would reject.
+
+    python -m unittest discover tests
+"""
+
+import os
+import time
+import unittest
+from unittest import mock
+
+os.environ.setdefault("FLASK_ENV", "development")
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+
+import jwt
+
+from core import auth_service
+
+
+def signed(payload, secret=None):
+    return jwt.encode(payload, secret or auth_service._jwt_secret(), algorithm=auth_service.JWT_ALGORITHM)
+
+
+def pyjwt_accepts(token):
+    """What a plain, uncached jwt.decode of the token makes of it."""
+    try:
+        jwt.decode(token, auth_service._jwt_secret(), algorithms=[auth_service.JWT_ALGORITHM])
+        return True
+    except (jwt.PyJWTError, TypeError):
+        return False
+
+
+class DecodeAccessTokenTests(unittest.TestCase):
+    def setUp(self):
+        auth_service._verified_claims.cache_clear()
+
+    def test_valid_token_decodes_to_subject(self):
+        token = auth_service.create_access_token("A@B.com")
+        self.assertEqual(auth_service.decode_access_token(token), "a@b.com")
+
+    def test_cached_token_is_rejected_once_it_expires(self):
+        exp = int(time.time()) + 60
+        token = signed({"sub": "a@b.com", "exp": exp})
+        self.assertEqual(auth_service.decode_access_token(token), "a@b.com")
+        with mock.patch.object(auth_service.time, "time", return_value=exp + 1):
+            self.assertIsNone(auth_service.decode_access_token(token))
+        self.assertGreaterEqual(auth_service._verified_claims.cache_info().hits, 1)
+
+    def test_expired_token_is_rejected(self):
+        token = signed({"sub": "a@b.com", "exp": int(time.time()) - 1})
+        self.assertIsNone(auth_service.decode_access_token(token))
+
+    def test_tampered_tokens_are_rejected(self):
+        token = auth_service.create_access_token("a@b.com")
+        header, payload, signature = token.split(".")
+        forged_payload = jwt.utils.base64url_encode(b'{"sub":"admin@b.com","exp":9999999999}').decode()
+        flipped = signature[:-2] + ("AA" if signature[-2:] != "AA" else "BB")
+        for bad in (
+            f"{header}.{forged_payload}.{signature}",
+            f"{header}.{payload}.{flipped}",
+            signed({"sub": "a@b.com", "exp": int(time.time()) + 60}, secret="other-secret"),
+            "not-a-token",
+        ):
+            with self.subTest(bad=bad):
+                self.assertIsNone(auth_service.decode_access_token(bad))
+
+    def test_non_numeric_exp_is_rejected(self):
+        for exp in ("never", None, [1], {"t": 1}, "1e12"):
+            with self.subTest(exp=exp):
+                token = signed({"sub": "a@b.com", "exp": exp})
+                self.assertIsNone(auth_service.decode_access_token(token))
+                self.assertIsNone(auth_service.decode_access_token(token))
+
+    def test_matches_pyjwt_for_exp_edge_cases(self):
+        future = int(time.time()) + 3600
+        for exp in (future, float(future), str(future), future + 0.9, int(time.time()) - 5, True):
+            with self.subTest(exp=exp):
+                token = signed({"sub": "a@b.com", "exp": exp})
+                accepted = auth_service.decode_access_token(token) is not None
+                self.assertEqual(accepted, pyjwt_accepts(token))
+        no_exp = signed({"sub": "a@b.com"})
+        self.assertEqual(auth_service.decode_access_token(no_exp) is not None, pyjwt_accepts(no_exp))
+
+
+if __name__ == "__main__":
+    unittest.main()
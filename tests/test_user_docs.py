@@ -0,0 +1,288 @@
+"""
+Tests for the per-request user document reads and writes in services/firebase/core.py,
+run against an in-process fake of the Firestore users collection.
+
+    python -m unittest discover tests
+"""
+
+import copy
+import os
+import threading
+import unittest
+from concurrent.futures import Future
+from unittest import mock
+
+os.environ.setdefault("FLASK_ENV", "development")
+
+from flask import Flask
+from google.api_core.exceptions import NotFound
+from google.cloud.firestore_v1 import _helpers
+from google.cloud.firestore_v1.field_path import FieldPath
+
+from services.firebase import core, db_state
+
+DOC_PATH = "projects/p/databases/(default)/documents/users/a@b.com"
+
+
+def apply_field_paths(doc, field_updates):
+    """Apply update() field paths the way Firestore does: walk/create maps, replace the leaf."""
+    doc = copy.deepcopy(doc)
+    for path, value in field_updates.items():
+        parts = FieldPath.from_string(path).parts
+        node = doc
+        for part in parts[:-1]:
+            if not isinstance(node.get(part), dict):
+                node[part] = {}
+            node = node[part]
+        node[parts[-1]] = copy.deepcopy(value)
+    return doc
+
+
+class FakeSnapshot:
+    def __init__(self, data):
+        self._data = data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data)
+
+
+class FakeDocument:
+    def __init__(self, collection, key):
+        self.collection = collection
+        self.key = key
+
+    def get(self):
+        coll = self.collection
+        coll.gets += 1
+        coll.get_entered.set()
+        snapshot = FakeSnapshot(copy.deepcopy(coll.store.get(self.key)))
+        if not coll.release_get.wait(5):
+            raise AssertionError("get() was never released")
+        if coll.get_error is not None:
+            raise coll.get_error
+        return snapshot
+
+    def update(self, field_updates):
+        if self.key not in self.collection.store:
+            raise NotFound("no document")
+        self.collection.store[self.key] = apply_field_paths(self.collection.store[self.key], field_updates)
+
+
+class FakeCollection:
+    def __init__(self):
+        self.store = {}
+        self.gets = 0
+        self.get_error = None
+        self.get_entered = threading.Event()
+        self.release_get = threading.Event()
+        self.release_get.set()
+
+    def document(self, key):
+        return FakeDocument(self, key)
+
+
+class UserDocTestCase(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.coll = FakeCollection()
+        self._saved_ref = db_state.users_collection_ref
+        db_state.users_collection_ref = self.coll
+        db_state.user_doc_inflight.clear()
+
+        # Readers that join an in-flight read wait in its Future.result(); count them as they do.
+        self.joined = threading.Semaphore(0)
+        joined = self.joined
+
+        class JoinSignallingFuture(Future):
+            def result(self, timeout=None):
+                joined.release()
+                return super().result(timeout)
+
+        patcher = mock.patch.object(core, "Future", JoinSignallingFuture)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.coll.release_get.set()
+        db_state.users_collection_ref = self._saved_ref
+        db_state.user_doc_inflight.clear()
+
+    def request(self, fn, *args):
+        """Run fn inside its own request scope and return its result."""
+        with self.app.test_request_context():
+            core.open_user_doc_scope()
+            return fn(*args)
+
+    def start_requests(self, count, key="a@b.com", followers_go=None):
+        """
+        Open `count` request scopes, then have them read `key` while get() is held, each
+        request starting before the shared read is issued. Request 0 reads first; the others
+        read once get() has been entered (or once `followers_go` is set). Returns (threads, results).
+        """
+        results = [None] * count
+        scopes_open = threading.Barrier(count + 1)
+
+        def run(i):
+            with self.app.test_request_context():
+                core.open_user_doc_scope()
+                scopes_open.wait()
+                if i:
+                    (followers_go or self.coll.get_entered).wait(5)
+                try:
+                    results[i] = core.read_user_doc(key)
+                except Exception as e:
+                    results[i] = e
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+        for t in threads:
+            t.start()
+        scopes_open.wait()
+        return threads, results
+
+    def wait_for_joiners(self, count):
+        """Block until `count` readers have joined the in-flight read."""
+        for _ in range(count):
+            if not self.joined.acquire(timeout=5):
+                self.fail("readers never joined the in-flight read")
+
+
+class ReadCoalescingTests(UserDocTestCase):
+    def test_concurrent_readers_share_one_read(self):
+        self.coll.store["a@b.com"] = {"todos_v1": [1]}
+        self.coll.release_get.clear()
+        threads, results = self.start_requests(8)
+        self.coll.get_entered.wait(5)
+        self.wait_for_joiners(7)
+        self.coll.release_get.set()
+        for t in threads:
+            t.join(5)
+        self.assertEqual(self.coll.gets, 1)
+        self.assertEqual(results, [{"todos_v1": [1]}] * 8)
+        self.assertEqual(db_state.user_doc_inflight, {})
+
+    def test_request_started_after_read_was_issued_reads_again(self):
+        self.coll.store["a@b.com"] = {"v": 1}
+        self.coll.release_get.clear()
+        threads, results = self.start_requests(1)
+        self.coll.get_entered.wait(5)
+        late = {}
+        late_thread = threading.Thread(target=lambda: late.update(doc=self.request(core.read_user_doc, "a@b.com")))
+        late_thread.start()
+        self.coll.release_get.set()
+        for t in (*threads, late_thread):
+            t.join(5)
+        self.assertEqual(self.coll.gets, 2)
+
+    def test_write_during_read_is_not_handed_to_later_readers(self):
+        self.coll.store["a@b.com"] = {"v": 1}
+        self.coll.release_get.clear()
+        write_done = threading.Event()
+        threads, results = self.start_requests(2, followers_go=write_done)
+        self.coll.get_entered.wait(5)
+        # Another request writes while the first read is still in flight ...
+        self.request(core.write_user_fields, "a@b.com", {"v": 2})
+        write_done.set()
+        self.coll.release_get.set()
+        for t in threads:
+            t.join(5)
+        self.assertEqual(results[0], {"v": 1})
+        # ... so the second reader, although it started before that read, fetched again.
+        self.assertEqual(results[1], {"v": 2})
+        self.assertEqual(self.coll.gets, 2)
+
+    def test_read_failure_reaches_every_waiter(self):
+        self.coll.store["a@b.com"] = {"v": 1}
+        self.coll.get_error = RuntimeError("firestore down")
+        self.coll.release_get.clear()
+        threads, results = self.start_requests(4)
+        self.coll.get_entered.wait(5)
+        self.wait_for_joiners(3)
+        self.coll.release_get.set()
+        for t in threads:
+            t.join(5)
+        self.assertEqual(self.coll.gets, 1)
+        for result in results:
+            self.assertIsInstance(result, RuntimeError)
+        self.assertEqual(db_state.user_doc_inflight, {})
+
+        self.coll.get_error = None
+        self.assertEqual(self.request(core.read_user_doc, "a@b.com"), {"v": 1})
+
+
+class RequestScopeTests(UserDocTestCase):
+    def test_document_is_read_once_per_request_and_again_next_request(self):
+        self.coll.store["a@b.com"] = {"v": 1}
+
+        def read_twice(key):
+            return core.read_user_doc(key), core.read_user_doc(key)
+
+        self.assertEqual(self.request(read_twice, "a@b.com"), ({"v": 1}, {"v": 1}))
+        self.assertEqual(self.coll.gets, 1)
+        self.coll.store["a@b.com"] = {"v": 2}
+        self.assertEqual(self.request(core.read_user_doc, "a@b.com"), {"v": 2})
+        self.assertEqual(self.coll.gets, 2)
+
+    def test_missing_user_is_not_remembered_across_requests(self):
+        self.assertIsNone(self.request(core.read_user_doc, "a@b.com"))
+        self.coll.store["a@b.com"] = {"email": "a@b.com"}
+        self.assertEqual(self.request(core.read_user_doc, "a@b.com"), {"email": "a@b.com"})
+
+    def test_write_updates_the_request_copy(self):
+        self.coll.store["a@b.com"] = {"habits_v1": {"2024-01-01_a": "done"}, "todos_v1": []}
+
+        def write_then_read(key):
+            core.read_user_doc(key)
+            self.assertTrue(core.write_user_fields(key, {"habits_v1": {"2024-01-02_a": "done"}}))
+            return core.read_user_doc(key)
+
+        self.assertEqual(self.request(write_then_read, "a@b.com"), self.coll.store["a@b.com"])
+        self.assertEqual(self.coll.gets, 1)
+
+    def test_write_to_deleted_user_is_rejected(self):
+        self.assertFalse(self.request(core.write_user_fields, "a@b.com", {"todos_v1": [1]}))
+        self.assertNotIn("a@b.com", self.coll.store)
+
+
+class MergeRuleTests(unittest.TestCase):
+    CASES = [
+        # name, existing document, fields written
+        ("nested map merges", {"m": {"a": 1, "b": {"c": 2}}}, {"m": {"b": {"d": 3}}}),
+        ("empty map replaces", {"m": {"a": 1}}, {"m": {}}),
+        ("list replaces", {"l": [1, 2]}, {"l": [3]}),
+        ("map replaces scalar", {"m": 5}, {"m": {"a": 1}}),
+        ("scalar replaces map", {"m": {"a": 1}}, {"m": None}),
+        ("new field", {"a": 1}, {"b": {"c": {"d": 1}}}),
+        ("keys needing quotes", {"habits_v1": {}}, {"habits_v1": {"2024-01-01_x.y": "done", "a b": 1}}),
+    ]
+
+    def test_leaf_paths_match_firestore_set_merge_mask(self):
+        for name, _, fields in self.CASES:
+            with self.subTest(name):
+                write = _helpers.pbs_for_set_with_merge(DOC_PATH, fields, merge=True)[0]
+                leaf_paths = core._leaf_field_paths(fields)
+                self.assertEqual(set(write.update_mask.field_paths), set(leaf_paths))
+                update = _helpers.pbs_for_update(DOC_PATH, leaf_paths, None)[0]
+                self.assertEqual(update.update.fields, write.update.fields)
+                self.assertTrue(update.current_document.exists)
+
+    def test_request_copy_merge_matches_applied_field_paths(self):
+        for name, existing, fields in self.CASES:
+            with self.subTest(name):
+                expected = apply_field_paths(existing, core._leaf_field_paths(fields))
+                self.assertEqual(core._merge_fields(existing, fields), expected)
+
+    def test_merge_does_not_mutate_inputs(self):
+        existing = {"m": {"a": [1]}}
+        fields = {"m": {"b": [2]}}
+        merged = core._merge_fields(existing, fields)
+        merged["m"]["b"].append(3)
+        self.assertEqual(existing, {"m": {"a": [1]}})
+        self.assertEqual(fields, {"m": {"b": [2]}})
+
+
+if __name__ == "__main__":
+    unittest.main()